@@ -0,0 +1,43 @@
+"""
+File cache for TAO Stats Visualizer
+Stores JSON-serializable values on disk so unchanged API pages and prices aren't refetched.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+
+class FileCache:
+    def __init__(self, directory, ttl):
+        self.directory = directory
+        self.ttl = ttl  # default max age in seconds
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.md5(key.encode()).hexdigest() + '.json')
+
+    def get(self, key, ttl=None):
+        """Return the cached value for key, or None if missing or older than ttl seconds"""
+        if ttl is None:
+            ttl = self.ttl
+
+        try:
+            with open(self._path(key)) as f:
+                entry = json.load(f)
+            if time.time() - entry['ts'] > ttl:
+                return None
+            return entry['data']
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def set(self, key, value):
+        """Store value under key, replacing any existing entry"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+
+        # Write to a temp file first so readers never see a partial entry
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'ts': time.time(), 'data': value}, f)
+        os.replace(tmp_path, path)
@@ -14,6 +14,19 @@ TAO_STATS_API_KEY = os.getenv('TAO_STATS_API_KEY')
 
 # API Settings
 API_BASE_URL = "https://api.taostats.io/api/stats/history/v1"
-REQUEST_DELAY = 3  # seconds between requests
+REQUEST_DELAY = 0.1  # seconds per request once the burst budget is used up; halved after a 429, recovered on success
 MAX_RETRIES = 3
 RATE_LIMIT_BACKOFF = 5  # base seconds for rate limit backoff
+MAX_CONCURRENT_REQUESTS = 6  # pages fetched in parallel
+MIN_PAGE_SIZE = 50  # former default page size; a rejected page size is never halved below this
+
+# Cache Settings (paths are relative to the working directory, not --output-dir)
+CACHE_DIR = ".cache/taostats"
+HISTORICAL_CACHE_TTL = 90 * 24 * 3600  # seconds; historical pages/prices never change
+LATEST_CACHE_TTL = 3600  # seconds; the latest prices may still be updated
+PRICE_CACHE_FILE = "tao_price_cache.parquet"  # daily prices, with a .meta.json sidecar
+PRICE_HISTORY_START = "2023-03-20"  # first data point in our dataset; prices are kept from here on
+DATA_CACHE_FILE = "tao_stats_cache.parquet"  # processed history, extended incrementally by block_number
+
+# Plot Settings
+MAX_PLOT_POINTS = 1500  # longer series are downsampled before plotting
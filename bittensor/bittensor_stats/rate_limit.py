@@ -0,0 +1,57 @@
+"""
+Rate limiting for TAO Stats Visualizer
+Token bucket shared by the fetch threads, so requests can burst up to capacity and are only
+spaced out once the budget is used up.
+"""
+
+import threading
+import time
+
+
+class TokenBucket:
+    def __init__(self, capacity, refill_rate, min_rate=None):
+        self.capacity = capacity
+        self.refill_rate = refill_rate  # tokens per second
+        self.max_rate = refill_rate
+        self.min_rate = min_rate if min_rate is not None else refill_rate / 16
+        self.tokens = capacity
+        self._updated = time.monotonic()
+        self._slowed_at = float('-inf')
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.refill_rate)
+        self._updated = now
+        return now
+
+    def consume(self):
+        """Take one token, sleeping until it is available; returns the time the token was granted"""
+        with self._lock:
+            now = self._refill()
+            # Going negative reserves a future token, so waiting threads are served in order
+            self.tokens -= 1
+            wait = -self.tokens / self.refill_rate if self.tokens < 0 else 0
+
+        if wait > 0:
+            time.sleep(wait)
+        return now + wait
+
+    def slow_down(self, sent_at):
+        """Halve the refill rate, down to min_rate, after the server rejects a request as rate limited.
+
+        sent_at is the time consume() granted the rejected request. Requests sent before the last
+        slow-down were already in flight at the old rate, so their 429s don't slow down again.
+        """
+        with self._lock:
+            if sent_at < self._slowed_at:
+                return
+            self._slowed_at = self._refill()
+            self.refill_rate = max(self.min_rate, self.refill_rate / 2)
+
+    def speed_up(self):
+        """Recover the refill rate step by step, up to the initial rate, after a successful request"""
+        with self._lock:
+            if self.refill_rate < self.max_rate:
+                self._refill()
+                self.refill_rate = min(self.max_rate, self.refill_rate + self.min_rate)
@@ -4,17 +4,87 @@ TAO Stats Visualizer
 Fetches data from TAO Stats API and generates graphs showing staked percentage vs current supply over time.
 """
 
-import requests
+import argparse
+import orjson
+import httpx
+import bottleneck as bn
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from datetime import datetime
+from datetime import datetime, timedelta
+import io
 import json
+import multiprocessing
 import time
+import random
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import compress
 import os
 import glob
-import yfinance as yf
-from config import TAO_STATS_API_KEY, API_BASE_URL, REQUEST_DELAY, MAX_RETRIES, RATE_LIMIT_BACKOFF
+from config import (TAO_STATS_API_KEY, API_BASE_URL, REQUEST_DELAY, MAX_RETRIES, RATE_LIMIT_BACKOFF,
+                    MAX_CONCURRENT_REQUESTS, MIN_PAGE_SIZE, CACHE_DIR, HISTORICAL_CACHE_TTL, LATEST_CACHE_TTL,
+                    PRICE_CACHE_FILE, PRICE_HISTORY_START, DATA_CACHE_FILE, MAX_PLOT_POINTS)
+from cache import FileCache
+from rate_limit import TokenBucket
+
+# Plotting and Yahoo Finance modules are slow to import, so they are loaded on first use
+_pyplot = None
+
+def _import_pyplot(interactive=False):
+    """Import pyplot and apply the plot style, once
+
+    Unless interactive, the Agg backend is selected first so no GUI toolkit is initialised.
+    """
+    global _pyplot
+    if _pyplot is None:
+        if not interactive:
+            import matplotlib
+            matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        plt.style.use('seaborn-v0_8')
+        sns.set_palette("husl")
+        _pyplot = plt
+    return _pyplot
+
+# Ticker objects fetch metadata on creation, so share one per symbol
+_yf_tickers = {}
+
+def _get_ticker(symbol):
+    """Return a cached yfinance-cache Ticker for symbol"""
+    if symbol not in _yf_tickers:
+        import yfinance_cache as yfc
+        _yf_tickers[symbol] = yfc.Ticker(symbol)
+    return _yf_tickers[symbol]
+
+def _price_meta_path(filename):
+    """Path of the JSON metadata sidecar for a price data file"""
+    return os.path.splitext(filename)[0] + '.meta.json'
+
+def _retry_after(headers, default):
+    """Seconds to wait according to a Retry-After header, or default if absent/unparseable"""
+    try:
+        return float(headers.get('Retry-After', default))
+    except (TypeError, ValueError):
+        return default
+
+def _page_size_rejected(response):
+    """Whether the API rejected a request because of its page size, rather than e.g. a bad parameter"""
+    if response.status_code == 413:
+        return True
+    return response.status_code == 400 and 'limit' in response.text.lower()
+
+# Fields used from each API row. Pages are kept column-wise as {field: [values]}, so the
+# per-row dicts from the JSON decoder are dropped as soon as each page is converted
+RAW_FIELDS = ('timestamp', 'block_number', 'issued', 'staked', 'accounts', 'balance_holders')
+
+def _to_columns(items):
+    """Convert a list of API row dicts into {field: [values]}"""
+    return {field: [item[field] for item in items] for field in RAW_FIELDS}
+
+def _columns_after_block(columns, since_block):
+    """Keep only the rows of columns with a block_number above since_block"""
+    keep = [int(block) > since_block for block in columns['block_number']]
+    return {field: list(compress(values, keep)) for field, values in columns.items()}
 
 class TaoStatsAPI:
     def __init__(self, api_key=None):
@@ -31,84 +101,273 @@ class TaoStatsAPI:
             'Authorization': api_key,
             'accept': 'application/json'
         }
+        
+        # One client shared by all fetch threads; over HTTPS, concurrent pages are multiplexed on
+        # a single HTTP/2 connection. The transport retries failed connections, while 429s,
+        # 5xx responses and other transport errors are retried in _get
+        self.client = httpx.Client(
+            headers=self.headers,
+            timeout=30.0,
+            transport=httpx.HTTPTransport(http2=True, retries=MAX_RETRIES),
+        )
+        
+        # monotonic time before which no new request should be sent
+        self._throttle_until = 0.0
+        # Shared by all fetch threads; replaced at the start of each fetch_all_data
+        self.bucket = self._new_bucket()
+        # Largest page size the server has accepted, learned on the first fetch
+        self._max_page_size = None
+        # False if a page failed during the last fetch_all_data, leaving a gap in its result
+        self.last_fetch_complete = True
+        
+        self.page_cache = FileCache(CACHE_DIR, HISTORICAL_CACHE_TTL)
+        self.price_cache = FileCache(os.path.join(CACHE_DIR, 'prices'), HISTORICAL_CACHE_TTL)
     
-    def fetch_all_data(self, frequency="by_day", limit=50):
-        """Fetch all historical data from the API"""
-        all_data = []
-        page = 1
-        max_retries = MAX_RETRIES
+    def fetch_all_data(self, frequency="by_day", limit=200, since_block=None):
+        """Fetch all historical data from the API, or only rows after since_block if given.
         
+        Returns {field: [values]} for RAW_FIELDS, or an empty dict if nothing was fetched.
+        """
         print("Fetching data from TAO Stats API...")
+        self.last_fetch_complete = True
+        self.bucket = self._new_bucket()  # undo any slow-down from a previous fetch
+        
+        if self._max_page_size is not None:
+            limit = min(limit, self._max_page_size)
+        
+        # The first page tells us how many pages there are and what page size the server honours
+        print("Fetching page 1...")
+        data, limit = self._fetch_first_page(frequency, limit)
+        if data is None:
+            return {}
+        
+        if 'data' not in data or not data['data']:
+            print("No more data found on page 1")
+            return {}
+        
+        columns = _to_columns(data['data'])
+        pagination = data.get('pagination', {})
+        del data
+        timestamps = columns['timestamp']
+        total_pages = pagination.get('total_pages', 1)
+        total_items = pagination.get('total_items', len(timestamps))
+        print(f"Page 1/{total_pages}, fetched {len(timestamps)} items, total items: {total_items}")
+        
+        # Rows are appended at the end when pages run oldest-first, so only the last page
+        # changes. Newest-first, every page shifts as rows arrive, so tie them to total_items.
+        newest_first = timestamps[0] > timestamps[-1]
+        key_suffix = f":{total_items}" if newest_first else ""
         
+        if since_block is not None and newest_first:
+            return self._fetch_new_pages(columns, frequency, limit, total_pages, total_items, key_suffix,
+                                         since_block)
+        
+        if total_pages > 1:
+            # Remaining pages are independent, so fetch them concurrently; httpx releases
+            # the GIL while waiting on the network, so threads are enough for this
+            pages = {}
+            with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+                futures = {
+                    executor.submit(self._fetch_page, page, frequency, limit, total_items, key_suffix): page
+                    for page in range(2, total_pages + 1)
+                }
+                # Report progress from this thread as pages finish, in whatever order they do
+                for future in as_completed(futures):
+                    page = futures[future]
+                    page_data, cached = future.result()
+                    pages[page] = page_data
+                    if page_data is None:
+                        print(f"Warning: page {page} could not be fetched, data will be incomplete")
+                        self.last_fetch_complete = False
+                    else:
+                        source = "cache" if cached else "API"
+                        print(f"Page {page}/{total_pages}, {len(page_data['timestamp'])} items from {source} "
+                              f"({len(pages)}/{total_pages - 1} remaining pages done)")
+            
+            # Reassemble in page order
+            for page in range(2, total_pages + 1):
+                if pages[page] is not None:
+                    for field in RAW_FIELDS:
+                        columns[field].extend(pages[page][field])
+        
+        if since_block is not None:
+            # Oldest-first, earlier pages come from the page cache, so just keep the new rows
+            columns = _columns_after_block(columns, since_block)
+        
+        print(f"Fetched {len(columns['timestamp'])} data points total")
+        return columns if columns['timestamp'] else {}
+    
+    def _fetch_new_pages(self, first_page, frequency, limit, total_pages, total_items, key_suffix, since_block):
+        """Walk newest-first pages in order until they overlap rows at or before since_block"""
+        new_data = {field: [] for field in RAW_FIELDS}
+        page, page_data = 1, first_page
         while True:
-            print(f"Fetching page {page}...")
+            fresh = _columns_after_block(page_data, since_block)
+            for field in RAW_FIELDS:
+                new_data[field].extend(fresh[field])
+            if len(fresh['timestamp']) < len(page_data['timestamp']) or page >= total_pages:
+                break
             
+            page += 1
+            page_data, cached = self._fetch_page(page, frequency, limit, total_items, key_suffix)
+            if page_data is None:
+                print(f"Warning: page {page} could not be fetched, data will be incomplete")
+                self.last_fetch_complete = False
+                break
+            source = "cache" if cached else "API"
+            print(f"Page {page}/{total_pages}, {len(page_data['timestamp'])} items from {source}")
+        
+        print(f"Fetched {len(new_data['timestamp'])} new data points after block {since_block}")
+        return new_data if new_data['timestamp'] else {}
+    
+    def _fetch_first_page(self, frequency, limit):
+        """Fetch page 1 synchronously, shrinking limit until the server accepts it.
+        
+        Returns the decoded JSON (or None on failure) and the page size to use for the other pages.
+        """
+        while True:
             params = {
                 'frequency': frequency,
-                'page': page,
+                'page': 1,
                 'limit': limit
             }
             
-            retry_count = 0
-            while retry_count < max_retries:
-                try:
-                    response = requests.get(self.base_url, headers=self.headers, params=params)
-                    
-                    if response.status_code == 429:  # Rate limited
-                        wait_time = 5 + (2 ** retry_count)  # Longer exponential backoff
-                        print(f"Rate limited. Waiting {wait_time} seconds before retry...")
-                        time.sleep(wait_time)
-                        retry_count += 1
-                        continue
-                    
-                    response.raise_for_status()
-                    data = response.json()
-                    
-                    if 'data' not in data or not data['data']:
-                        print(f"No more data found on page {page}")
-                        return all_data
-                    
-                    all_data.extend(data['data'])
-                    
-                    # Print pagination info
-                    pagination = data.get('pagination', {})
-                    total_pages = pagination.get('total_pages', 1)
-                    total_items = pagination.get('total_items', len(all_data))
-                    print(f"Page {page}/{total_pages}, fetched {len(data['data'])} items, total so far: {len(all_data)}/{total_items}")
-                    
-                    # Check if we've reached the last page
-                    if page >= total_pages:
-                        print(f"Reached last page: {page}")
-                        return all_data
-                    
-                    break  # Success, exit retry loop
-                    
-                except requests.exceptions.RequestException as e:
-                    print(f"Error fetching data (attempt {retry_count + 1}): {e}")
-                    retry_count += 1
-                    if retry_count < max_retries:
-                        wait_time = 2 ** retry_count
-                        print(f"Retrying in {wait_time} seconds...")
-                        time.sleep(wait_time)
-                    else:
-                        print(f"Failed to fetch page {page} after {max_retries} attempts")
-                        return all_data
+            try:
+                response = self._get(params)
+                if _page_size_rejected(response) and limit > MIN_PAGE_SIZE:
+                    limit = max(limit // 2, MIN_PAGE_SIZE)
+                    print(f"Page size rejected, retrying with limit={limit}...")
+                    continue
+                if response.is_client_error and response.text:
+                    print(f"API error response: {response.text[:200]}")
+                response.raise_for_status()
+                data = orjson.loads(response.content)
+            except (httpx.HTTPError, orjson.JSONDecodeError) as e:
+                print(f"Failed to fetch page 1: {e}")
+                return None, limit
             
-            page += 1
-            time.sleep(3)  # Much longer delay between successful requests to avoid rate limits
+            items = data.get('data') or []
+            total_pages = data.get('pagination', {}).get('total_pages', 1)
+            if 0 < len(items) < limit and total_pages > 1:
+                # The server capped the page size without saying so; refetch at that size so
+                # page offsets and total_pages line up with what it actually returns
+                limit = len(items)
+                print(f"Server returned {limit} items per page, retrying with limit={limit}...")
+                continue
+            
+            self._max_page_size = limit
+            return data, limit
+    
+    def _fetch_page(self, page, frequency, limit, total_items, key_suffix=""):
+        """Fetch a single page from the cache or the API.
+        
+        Returns ({field: [values]} or None on failure, whether the page came from the cache).
+        """
+        cache_key = f"{frequency}:{page}:{limit}{key_suffix}"
+        # A page that isn't full gains rows as they arrive, even once it is no longer the last
+        # page, so unless pages are already pinned to total_items it is cached per total_items
+        partial_key = cache_key if key_suffix else f"{cache_key}:{total_items}"
+        page_data = self.page_cache.get(cache_key)
+        if isinstance(page_data, list):
+            page_data = _to_columns(page_data)  # cached row-wise by an older version
+        if page_data is not None and (key_suffix or len(page_data['timestamp']) >= limit):
+            return page_data, True
+        if partial_key != cache_key:
+            page_data = self.page_cache.get(partial_key)
+            if page_data is not None:
+                return page_data, True
         
-        print(f"Fetched {len(all_data)} data points total")
-        return all_data
+        params = {
+            'frequency': frequency,
+            'page': page,
+            'limit': limit
+        }
+        
+        try:
+            response = self._get(params)
+            response.raise_for_status()
+            data = orjson.loads(response.content)
+        except (httpx.HTTPError, orjson.JSONDecodeError) as e:
+            print(f"Failed to fetch page {page}: {e}")
+            return None, False
+        
+        page_data = _to_columns(data.get('data') or [])
+        self.page_cache.set(cache_key if len(page_data['timestamp']) >= limit else partial_key, page_data)
+        return page_data, False
+    
+    def _get(self, params):
+        """GET the API, retrying rate limits, server errors and transport errors.
+        
+        Returns the last response if rate limits or server errors persist, and raises the last
+        httpx.TransportError if the request keeps failing.
+        """
+        for retry_count in range(MAX_RETRIES):
+            final_attempt = retry_count == MAX_RETRIES - 1
+            sent_at = self._wait_for_request_slot()
+            try:
+                response = self.client.get(self.base_url, params=params)
+            except httpx.TransportError as e:
+                # The transport only retries failed connections, not timeouts or dropped streams
+                if final_attempt:
+                    raise
+                wait_time = 2 ** retry_count
+                print(f"Page {params['page']} failed ({e!r}). Retrying in {wait_time} seconds...")
+                time.sleep(wait_time)
+                continue
+            
+            self._note_rate_limit(response.headers)
+            if response.status_code == 429:
+                # We're sending faster than the server allows, so slow down until requests get through again
+                self.bucket.slow_down(sent_at)
+                if final_attempt:
+                    return response
+                wait_time = _retry_after(response.headers, RATE_LIMIT_BACKOFF + 2 ** retry_count)
+                # Jitter so concurrent pages don't all retry at the same instant
+                wait_time += random.uniform(0, 0.5 * wait_time)
+                print(f"Page {params['page']} rate limited. Waiting {wait_time:.1f} seconds before retry...")
+            elif response.status_code in (500, 502, 503, 504):
+                if final_attempt:
+                    return response
+                wait_time = 2 ** retry_count
+                print(f"Page {params['page']} got HTTP {response.status_code}. Retrying in {wait_time} seconds...")
+            else:
+                self.bucket.speed_up()
+                return response
+            time.sleep(wait_time)
+    
+    @staticmethod
+    def _new_bucket():
+        """Token bucket allowing a full batch of concurrent pages at once, then one request per REQUEST_DELAY"""
+        return TokenBucket(capacity=MAX_CONCURRENT_REQUESTS, refill_rate=1 / REQUEST_DELAY,
+                           min_rate=1 / RATE_LIMIT_BACKOFF)
+    
+    def _wait_for_request_slot(self):
+        """Block until the token bucket allows another request and any throttle has ended; returns the send time"""
+        sent_at = self.bucket.consume()
+        delay = self._throttle_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+            sent_at += delay
+        return sent_at
+    
+    def _note_rate_limit(self, headers):
+        """Hold off further requests when the server reports the rate limit is nearly used up"""
+        try:
+            remaining = int(headers.get('X-RateLimit-Remaining', ''))
+        except (TypeError, ValueError):
+            return
+        if remaining < 2:
+            self._throttle_until = max(self._throttle_until, time.monotonic() + RATE_LIMIT_BACKOFF)
     
     def fetch_tao_price_data(self):
         """Fetch current TAO price from Yahoo Finance via yfinance"""
         try:
             print("Fetching current TAO price from Yahoo Finance...")
-            tao = yf.Ticker('TAO22974-USD')
+            tao = _get_ticker('TAO22974-USD')
             
             # Get the most recent price
             hist = tao.history(period='1d')
-            if len(hist) > 0:
+            if hist is not None and len(hist) > 0:
                 current_price = hist['Close'].iloc[-1]
                 print(f"Current TAO price: ${current_price:.2f}")
                 return current_price
@@ -121,36 +380,47 @@ class TaoStatsAPI:
             print("Using default TAO price of $500")
             return 500.0
     
-    def fetch_historical_tao_prices(self, from_date=None, to_date=None):
-        """Fetch historical TAO price data from Yahoo Finance via yfinance"""
+    def fetch_historical_tao_prices(self, from_date=None, to_date=None, fallback=True):
+        """Fetch historical TAO price data from Yahoo Finance via yfinance.
+        
+        If nothing is found and fallback is set, returns the current price for today instead.
+        """
         try:
             print("Fetching historical TAO price data from Yahoo Finance...")
             
             # If no dates provided, fetch from the earliest possible date
             if from_date is None:
-                from_date = "2023-03-20"  # First data point in our dataset
+                from_date = PRICE_HISTORY_START
             if to_date is None:
                 to_date = datetime.now().strftime("%Y-%m-%d")
             
-            print(f"Fetching historical TAO price data from {from_date} to {to_date}")
+            # Ranges that end before today are complete and won't change
+            cache_key = f"{from_date}:{to_date}"
+            today = datetime.now().strftime("%Y-%m-%d")
+            ttl = LATEST_CACHE_TTL if to_date >= today else HISTORICAL_CACHE_TTL
+            daily_prices = self.price_cache.get(cache_key, ttl)
+            if daily_prices:
+                print(f"Loaded {len(daily_prices)} days of historical price data from cache")
+                return daily_prices
             
-            # Use yfinance to get historical data
-            tao = yf.Ticker('TAO22974-USD')
+            print(f"Fetching historical TAO price data from {from_date} to {to_date}")
             
             # Convert date strings to datetime objects for yfinance
             start_date = datetime.strptime(from_date, "%Y-%m-%d")
             end_date = datetime.strptime(to_date, "%Y-%m-%d")
             
-            # Fetch historical data
-            hist = tao.history(start=start_date, end=end_date)
+            # Fetch historical data (callers only request ranges missing from the price cache)
+            import yfinance as yf
+            hist = yf.download('TAO22974-USD', start=start_date, end=end_date,
+                               progress=False, threads=True, auto_adjust=False)
+            if isinstance(hist.columns, pd.MultiIndex):
+                # Newer yfinance versions key columns by (field, ticker)
+                hist.columns = hist.columns.get_level_values(0)
             
             daily_prices = {}
             if len(hist) > 0:
                 # Convert to daily prices dictionary
-                for date_idx, row in hist.iterrows():
-                    date_str = date_idx.strftime("%Y-%m-%d")
-                    price = row['Close']
-                    daily_prices[date_str] = price
+                daily_prices = dict(zip(hist.index.strftime("%Y-%m-%d"), hist['Close'].tolist()))
                 
                 print(f"Successfully fetched {len(daily_prices)} days of historical price data from Yahoo Finance")
                 print(f"Date range: {min(daily_prices.keys())} to {max(daily_prices.keys())}")
@@ -160,9 +430,12 @@ class TaoStatsAPI:
                     sample_dates = sorted(daily_prices.keys())
                     print(f"Sample prices: {sample_dates[0]}: ${daily_prices[sample_dates[0]]:.2f}, {sample_dates[-1]}: ${daily_prices[sample_dates[-1]]:.2f}")
                 
+                self.price_cache.set(cache_key, daily_prices)
                 return daily_prices
             else:
                 print("Warning: No historical price data found in Yahoo Finance")
+                if not fallback:
+                    return {}
                 
                 # Fallback: try to get current price
                 try:
@@ -179,6 +452,8 @@ class TaoStatsAPI:
                 
         except Exception as e:
             print(f"Error in fetch_historical_tao_prices: {e}")
+            if not fallback:
+                return {}
             print("Attempting fallback to current price...")
             
             # Final fallback
@@ -192,31 +467,38 @@ class TaoStatsAPI:
             
             return {}
     
-    def save_price_data(self, price_data, filename=None):
-        """Save historical price data to CSV file"""
+    def save_price_data(self, price_data, filename=PRICE_CACHE_FILE, first_date=None):
+        """Save historical price data to a Parquet file with a JSON metadata sidecar
+        
+        first_date is the start of the range that was requested, which may be before the first price.
+        """
         if not price_data:
             print("No price data to save")
             return None
-            
-        if filename is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"tao_price_data_{timestamp}.csv"
         
         # Convert to DataFrame
-        df = pd.DataFrame([
-            {'date': date, 'price_usd': price} 
-            for date, price in sorted(price_data.items())
-        ])
+        df = pd.DataFrame({
+            'date': list(price_data.keys()),
+            'price_usd': list(price_data.values())
+        }).sort_values('date')
+        
+        df.to_parquet(filename, index=False)
+        
+        meta = {
+            'first_date': min(first_date or df['date'].iloc[0], df['date'].iloc[0]),
+            'last_date': df['date'].iloc[-1],
+            'fetched_at': datetime.now().isoformat()
+        }
+        with open(_price_meta_path(filename), 'w') as f:
+            json.dump(meta, f)
         
-        # Save to CSV
-        df.to_csv(filename, index=False)
         print(f"Saved {len(df)} price data points to {filename}")
         return filename
     
-    def load_price_data(self, filename):
-        """Load historical price data from CSV file"""
+    def load_price_data(self, filename=PRICE_CACHE_FILE):
+        """Load historical price data from a Parquet file"""
         try:
-            df = pd.read_csv(filename)
+            df = pd.read_parquet(filename)
             price_dict = dict(zip(df['date'], df['price_usd']))
             print(f"Loaded {len(price_dict)} price data points from {filename}")
             return price_dict
@@ -225,243 +507,364 @@ class TaoStatsAPI:
             return {}
     
     def get_or_fetch_price_data(self, start_date=None, end_date=None):
-        """Get price data from local file or fetch from API if needed"""
-        # Look for existing price data files
-        import glob
-        price_files = glob.glob("tao_price_data_*.csv")
-        
-        if price_files:
-            # Use the most recent price data file
-            latest_file = max(price_files, key=os.path.getctime)
-            print(f"Found existing price data: {latest_file}")
-            
-            # Check if we should update the data
-            file_date = datetime.fromtimestamp(os.path.getctime(latest_file))
-            if (datetime.now() - file_date).days > 1:
-                print("Price data is more than 1 day old, fetching updates...")
-                # Fetch new data and merge with existing
-                existing_prices = self.load_price_data(latest_file)
-                new_prices = self.fetch_historical_tao_prices(start_date, end_date)
-                
-                # Merge data (new data overwrites old for same dates)
-                combined_prices = {**existing_prices, **new_prices}
-                
-                # Save updated data
-                new_filename = self.save_price_data(combined_prices)
-                return combined_prices
-            else:
-                # Use existing data
-                return self.load_price_data(latest_file)
-        else:
-            # No existing data, fetch from API
-            print("No existing price data found, fetching from CoinGecko...")
-            price_data = self.fetch_historical_tao_prices(start_date, end_date)
+        """Get price data from the local cache, fetching only dates missing from it"""
+        try:
+            with open(_price_meta_path(PRICE_CACHE_FILE)) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = None
+        
+        price_data = self.load_price_data() if meta is not None else {}
+        if not price_data:
+            # No existing data, fetch the full range
+            print("No existing price data found, fetching from Yahoo Finance...")
+            price_data = self.fetch_historical_tao_prices(start_date, end_date, fallback=False)
             if price_data:
-                self.save_price_data(price_data)
-            return price_data
+                self.save_price_data(price_data, first_date=start_date or PRICE_HISTORY_START)
+                return price_data
+            # Use the current price for this run only; saving it would make it look like the
+            # history starts today, and every row would keep this one price on later runs
+            current_date = datetime.now().strftime("%Y-%m-%d")
+            return {current_date: self.fetch_tao_price_data()}
+        
+        # Yahoo's history may start after the requested date, so compare with what was requested
+        first_cached = meta.get('first_date', min(price_data.keys()))
+        last_cached = max(price_data.keys())
+        if start_date is None:
+            start_date = PRICE_HISTORY_START
+        if end_date is None:
+            end_date = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+        
+        # Without the current-price fallback a failed fetch adds nothing,
+        # so the gap is retried next run instead of being papered over
+        missing_prices = {}
+        if start_date < first_cached:
+            print(f"Price data starts at {first_cached}, fetching earlier dates...")
+            earlier_prices = self.fetch_historical_tao_prices(start_date, first_cached, fallback=False)
+            if earlier_prices:
+                first_cached = start_date
+                missing_prices.update(earlier_prices)
+        if last_cached < end_date:
+            print(f"Price data ends at {last_cached}, fetching updates...")
+            missing_prices.update(self.fetch_historical_tao_prices(from_date=last_cached, fallback=False))
+        
+        if missing_prices:
+            # New data overwrites old for the overlapping dates
+            price_data = {**price_data, **missing_prices}
+            self.save_price_data(price_data, first_date=first_cached)
+        
+        return price_data
     
-    def process_data(self, raw_data, include_usd=True, price_data=None):
-        """Process raw API data into a pandas DataFrame"""
-        processed_data = []
+    def fetch_dataset(self, cache_file=DATA_CACHE_FILE):
+        """Return the processed history without USD columns, fetching only rows newer than cache_file"""
+        cached = None
+        since_block = None
+        if os.path.exists(cache_file):
+            cached = pd.read_parquet(cache_file)
+            print(f"Loaded {len(cached)} cached data points from {cache_file}")
+            if len(cached):
+                since_block = int(cached['block_number'].max())
+        
+        raw_data = self.fetch_all_data(since_block=since_block)
+        if not raw_data:
+            return cached
+        
+        # Prices are joined after merging so older rows pick up refreshed prices too
+        df = self.process_data(raw_data, include_usd=False)
+        if cached is not None:
+            df = pd.concat([cached, df], ignore_index=True).drop_duplicates('block_number', keep='last')
+            df = df.sort_values('timestamp', kind='mergesort', ignore_index=True)
+        
+        # Later runs only fetch past the newest cached block, so a gap saved now would never be filled
+        if not self.last_fetch_complete:
+            print(f"Some pages failed, not updating {cache_file}")
+            return df
         
+        df.to_parquet(cache_file, index=False, compression='zstd')
+        print(f"Saved {len(df)} data points to {cache_file}")
+        return df
+    
+    def process_data(self, raw_data, include_usd=True, price_data=None):
+        """Process raw API data ({field: [values]} or a list of row dicts) into a pandas DataFrame"""
         # Get historical price data if USD calculations are requested
         if include_usd and price_data is None:
             price_data = self.get_or_fetch_price_data()
         elif not include_usd:
             price_data = None
         
-        for entry in raw_data:
-            # Convert values from strings to integers (they're in smallest units)
-            issued = int(entry['issued'])  # Total supply in raw units
-            staked = int(entry['staked'])  # Total staked in raw units
-            
-            # Calculate staked percentage
-            staked_percentage = (staked / issued) * 100 if issued > 0 else 0
-            
-            # Convert from raw units to TAO (divide by 10^9)
-            issued_tao = issued / 1e9
-            staked_tao = staked / 1e9
-            circulating_tao = issued_tao - staked_tao  # Unstaked/circulating supply
-            
-            # Base data structure
-            data_point = {
-                'timestamp': pd.to_datetime(entry['timestamp']),
-                'block_number': int(entry['block_number']),
-                'issued_tao': issued_tao,
-                'staked_tao': staked_tao,
-                'circulating_tao': circulating_tao,
-                'staked_percentage': staked_percentage,
-                'circulating_percentage': (circulating_tao / issued_tao) * 100 if issued_tao > 0 else 0,
-                'accounts': int(entry['accounts']),
-                'balance_holders': int(entry['balance_holders'])
-            }
-            
-            # Add USD calculations if requested
-            if include_usd and price_data is not None:
-                # Get the date for price lookup
-                timestamp_obj = datetime.fromisoformat(entry['timestamp'].replace('Z', '+00:00'))
-                date_str = timestamp_obj.strftime("%Y-%m-%d")
-                
-                # Find the closest price data for this date
-                tao_price_usd = None
-                if date_str in price_data:
-                    tao_price_usd = price_data[date_str]
-                else:
-                    # Find the closest available date
-                    available_dates = sorted(price_data.keys())
-                    for i, available_date in enumerate(available_dates):
-                        if available_date >= date_str:
-                            tao_price_usd = price_data[available_date]
-                            break
-                    
-                    # If no future date found, use the last available price
-                    if tao_price_usd is None and available_dates:
-                        tao_price_usd = price_data[available_dates[-1]]
-                
-                if tao_price_usd is not None:
-                    data_point.update({
-                        'total_market_cap_usd': issued_tao * tao_price_usd,
-                        'staked_market_cap_usd': staked_tao * tao_price_usd,
-                        'circulating_market_cap_usd': circulating_tao * tao_price_usd,
-                        'tao_price_usd': tao_price_usd,
-                    })
-            
-            processed_data.append(data_point)
+        # Only pull the fields we use out of each entry, and convert them in one pass
+        raw = pd.DataFrame(raw_data, columns=list(RAW_FIELDS))
+        raw = raw.astype({'block_number': 'int64', 'issued': 'int64', 'staked': 'int64',
+                          'accounts': 'int64', 'balance_holders': 'int64'})
+        
+        # Values come as strings in smallest units (1 TAO = 10^9); work on the
+        # underlying arrays to skip index alignment
+        issued = raw['issued'].to_numpy()
+        staked = raw['staked'].to_numpy()
+        issued_tao = issued / 1e9
+        staked_tao = staked / 1e9
+        circulating_tao = issued_tao - staked_tao  # Unstaked/circulating supply
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            staked_percentage = np.where(issued > 0, staked / issued * 100, 0)
+            circulating_percentage = np.where(issued > 0, circulating_tao / issued_tao * 100, 0)
+        
+        df = pd.DataFrame({
+            'timestamp': pd.to_datetime(raw['timestamp'], utc=True, format='ISO8601'),
+            'block_number': raw['block_number'],
+            'issued_tao': issued_tao,
+            'staked_tao': staked_tao,
+            'circulating_tao': circulating_tao,
+            'staked_percentage': staked_percentage,
+            'circulating_percentage': circulating_percentage,
+            'accounts': raw['accounts'],
+            'balance_holders': raw['balance_holders']
+        })
         
-        df = pd.DataFrame(processed_data)
-        df = df.sort_values('timestamp')  # Sort by date
+        # float32 keeps ~7 significant digits (under 1 TAO at current supply) and counts fit
+        # in int32, so this halves memory for everything downstream, including the plots
+        df = df.astype({
+            'issued_tao': 'float32',
+            'staked_tao': 'float32',
+            'circulating_tao': 'float32',
+            'staked_percentage': 'float32',
+            'circulating_percentage': 'float32',
+            'accounts': 'int32',
+            'balance_holders': 'int32'
+        })
+        df = df.sort_values('timestamp', kind='mergesort')  # Sort by date, keeping API order for ties
+        
+        # Summarise while the column is hot; reports and plots read it from attrs
+        df.attrs['summary'] = _compute_staking_summary(df)
+        
+        # Add USD calculations if requested
+        if include_usd and price_data:
+            df = add_usd_columns(df, price_data)
         return df
 
-def create_visualizations(df):
-    """Create comprehensive visualizations of TAO staking data"""
+def _compute_staking_summary(df):
+    """Staked percentage mean/min/max/std, plus the row count and block range they cover"""
+    stats = df['staked_percentage'].agg(['mean', 'min', 'max', 'std'])
+    blocks = df['block_number']
+    summary = {
+        'rows': len(df),
+        'first_block': int(blocks.iloc[0]) if len(df) else None,
+        'last_block': int(blocks.iloc[-1]) if len(df) else None,
+    }
+    # Plain floats so the summary survives Parquet's JSON-encoded attrs
+    summary.update((name, float(value)) for name, value in stats.items())
+    return summary
+
+def staking_summary(df):
+    """Return df.attrs['summary'] if it still describes df's rows, otherwise compute and store it"""
+    summary = df.attrs.get('summary')
+    if (not summary or summary.get('rows') != len(df)
+            or (len(df) and (summary.get('first_block') != int(df['block_number'].iloc[0])
+                             or summary.get('last_block') != int(df['block_number'].iloc[-1])))):
+        summary = _compute_staking_summary(df)
+        df.attrs['summary'] = summary
+    return summary
+
+def centered_moving_mean(values, window):
+    """Centered moving average, equivalent to Series.rolling(window, center=True, min_periods=1).mean()"""
+    # bottleneck's move_mean is trailing, so pad with NaNs (ignored via min_count) and shift the
+    # result back by pandas' centering offset; float64 keeps its running sum from drifting
+    values = np.asarray(values, dtype=np.float64)
+    offset = (window - 1) // 2
+    padding = np.full(window, np.nan)
+    means = bn.move_mean(np.concatenate([padding, values, padding[:offset]]), window=window, min_count=1)
+    return means[window + offset:]
+
+def downsample_index(n, max_points=MAX_PLOT_POINTS):
+    """Positions of at most max_points evenly spaced rows out of n, always keeping the first and last"""
+    if n <= max_points:
+        return np.arange(n)
+    return np.unique(np.linspace(0, n - 1, max_points).round().astype(np.intp))
+
+def _date_nums(timestamps):
+    """Matplotlib date numbers for a timestamp Series, in UTC if it is tz-aware"""
+    import matplotlib.dates as mdates
+    return mdates.date2num(timestamps.to_numpy('datetime64[ns]'))
+
+def _draw_fills(ax1, ax5, x, plot_df, has_usd_data):
+    """Draw the filled areas of the supply and stacked panels at date numbers x, returning their collections"""
+    fills = [
+        ax1.fill_between(x, plot_df['circulating_tao'], alpha=0.3, color='#00BF63', label='Circulating (Unstaked)'),
+        ax1.fill_between(x, plot_df['circulating_tao'], plot_df['issued_tao'], alpha=0.3, color='#FF6B35', label='Staked'),
+    ]
+    if has_usd_data:
+        fills += ax5.stackplot(x, 
+                               plot_df['circulating_market_cap_usd'], 
+                               plot_df['staked_market_cap_usd'],
+                               labels=['Circulating Market Cap', 'Staked Market Cap'],
+                               colors=['#00BF63', '#FF6B35'], alpha=0.7)
+    else:
+        fills += ax5.stackplot(x, 
+                               plot_df['circulating_tao'], 
+                               plot_df['staked_tao'],
+                               labels=['Circulating TAO', 'Staked TAO'],
+                               colors=['#00BF63', '#FF6B35'], alpha=0.7)
+    return fills
+
+def _supply_segments(x, plot_df):
+    """Total and circulating supply lines for the supply panel"""
+    return [np.column_stack([x, plot_df['issued_tao']]),
+            np.column_stack([x, plot_df['circulating_tao']])]
+
+def _staking_segments(x, df, rows):
+    """Daily, 7-day and 30-day staked percentage lines; averages are taken over every row of df"""
+    staked_pct = df['staked_percentage'].to_numpy()
+    series = (staked_pct, centered_moving_mean(staked_pct, 7), centered_moving_mean(staked_pct, 30))
+    return [np.column_stack([x, values[rows]]) for values in series]
+
+def create_visualizations(df, dpi=120, avg_staked=None):
+    """Create comprehensive visualizations of TAO staking data and return the figure"""
+    fig, _ = build_visualizations(df, dpi=dpi, avg_staked=avg_staked)
+    return fig
+
+def build_visualizations(df, dpi=120, avg_staked=None):
+    """Create comprehensive visualizations of TAO staking data.
     
-    # Set style
-    plt.style.use('seaborn-v0_8')
-    sns.set_palette("husl")
+    dpi applies to the on-screen figure; pass a higher dpi to savefig for the exported image.
+    avg_staked is the mean staked percentage, if already computed.
+    Returns (fig, artists); pass artists to update_visualizations to redraw with new data.
+    """
+    plt = _import_pyplot()
+    import matplotlib.dates as mdates
+    from matplotlib.collections import LineCollection
+    from matplotlib.colors import to_rgba
+    from matplotlib.lines import Line2D
     
     # Check if USD data is available
     has_usd_data = 'tao_price_usd' in df.columns
     
-    # Create figure with subplots
-    fig = plt.figure(figsize=(20, 16))
+    # Long histories have far more points than pixels, so plot an evenly spaced subset;
+    # averages and annotations still use every row
+    rows = downsample_index(len(df))
+    plot_df = df.iloc[rows]
+    # Convert dates once and plot every panel against the numbers, skipping unit conversion per call
+    x = _date_nums(plot_df['timestamp'])
+    
+    # Create figure with subplots; every panel shares the date axis, so its ticks are computed once
+    fig, axes = plt.subplots(3, 2, figsize=(20, 16), dpi=dpi, sharex=True)
+    (ax1, ax2), (ax3, ax4), (ax5, ax6) = axes
+    locator = mdates.AutoDateLocator(maxticks=8)
+    ax1.xaxis.set_major_locator(locator)
+    ax1.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+    ax1.xaxis_date()
+    ax1.set_xlim(x[0], x[-1])
     
     # 1. Total Supply vs Circulating Supply
-    ax1 = plt.subplot(3, 2, 1)
-    ax1.plot(df['timestamp'], df['issued_tao'], color='#2E86AB', linewidth=2.5, label='Total Supply')
-    ax1.plot(df['timestamp'], df['circulating_tao'], color='#00BF63', linewidth=2.5, label='Circulating Supply')
-    ax1.fill_between(df['timestamp'], df['circulating_tao'], alpha=0.3, color='#00BF63', label='Circulating (Unstaked)')
-    ax1.fill_between(df['timestamp'], df['circulating_tao'], df['issued_tao'], alpha=0.3, color='#FF6B35', label='Staked')
+    # Panels with several lines draw them as one collection, with proxy lines for the legend
+    supply_colors = ['#2E86AB', '#00BF63']
+    supply_lines = ax1.add_collection(LineCollection(_supply_segments(x, plot_df),
+                                                     colors=supply_colors, linewidths=2.5))
+    supply_handles = [Line2D([], [], color=color, linewidth=2.5, label=label)
+                      for color, label in zip(supply_colors, ['Total Supply', 'Circulating Supply'])]
+    fills = _draw_fills(ax1, ax5, x, plot_df, has_usd_data)
     
     ax1.set_title('TAO Supply: Total vs Circulating Over Time', fontsize=14, fontweight='bold')
     ax1.set_ylabel('TAO Supply', fontsize=12)
-    ax1.set_xlabel('Date', fontsize=12)
     ax1.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{x/1e6:.1f}M'))
     ax1.grid(True, alpha=0.3)
-    ax1.legend()
+    ax1.legend(handles=supply_handles + fills[:2], loc='upper left')
     
     # 2. TAO Staked Amount Over Time (or Price if USD data available)
-    ax2 = plt.subplot(3, 2, 2)
     if has_usd_data:
-        ax2.plot(df['timestamp'], df['tao_price_usd'], color='#F18F01', linewidth=3)
+        ax2_column = 'tao_price_usd'
+        ax2_line, = ax2.plot(x, plot_df['tao_price_usd'], color='#F18F01', linewidth=3)
         ax2.set_title('TAO Price (USD) Over Time', fontsize=14, fontweight='bold')
         ax2.set_ylabel('TAO Price (USD)', fontsize=12)
         ax2.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x:.0f}'))
         
         # Add current price annotation
         current_price = df.iloc[-1]['tao_price_usd']
-        ax2.annotate(f'Current: ${current_price:.2f}', 
-                    xy=(df.iloc[-1]['timestamp'], current_price),
+        ax2_label = lambda v: f'Current: ${v:.2f}'
+        ax2_annotation = ax2.annotate(ax2_label(current_price), 
+                    xy=(x[-1], current_price),
                     xytext=(10, 10), textcoords='offset points',
                     bbox=dict(boxstyle='round,pad=0.3', facecolor='yellow', alpha=0.7),
                     fontsize=10, fontweight='bold')
     else:
-        ax2.plot(df['timestamp'], df['staked_tao'], color='#F18F01', linewidth=2.5)
+        ax2_column = 'staked_tao'
+        ax2_line, = ax2.plot(x, plot_df['staked_tao'], color='#F18F01', linewidth=2.5)
         ax2.set_title('Total TAO Staked Over Time', fontsize=14, fontweight='bold')
         ax2.set_ylabel('Staked TAO', fontsize=12)
         ax2.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{x/1e6:.1f}M'))
         
         # Add current staked annotation
         current_staked = df.iloc[-1]['staked_tao']
-        ax2.annotate(f'Current: {current_staked/1e6:.1f}M TAO', 
-                    xy=(df.iloc[-1]['timestamp'], current_staked),
+        ax2_label = lambda v: f'Current: {v/1e6:.1f}M TAO'
+        ax2_annotation = ax2.annotate(ax2_label(current_staked), 
+                    xy=(x[-1], current_staked),
                     xytext=(10, 10), textcoords='offset points',
                     bbox=dict(boxstyle='round,pad=0.3', facecolor='orange', alpha=0.7),
                     fontsize=10, fontweight='bold')
     
-    ax2.set_xlabel('Date', fontsize=12)
     ax2.grid(True, alpha=0.3)
     
     # 3. Staking Percentage with Moving Averages
-    ax3 = plt.subplot(3, 2, 3)
     
-    # Calculate rolling averages
-    df['staked_pct_7d'] = df['staked_percentage'].rolling(window=7, center=True).mean()
-    df['staked_pct_30d'] = df['staked_percentage'].rolling(window=30, center=True).mean()
-    
-    ax3.plot(df['timestamp'], df['staked_percentage'], color='lightgray', alpha=0.6, linewidth=1, label='Daily')
-    ax3.plot(df['timestamp'], df['staked_pct_7d'], color='#FF6B35', linewidth=2, label='7-day average')
-    ax3.plot(df['timestamp'], df['staked_pct_30d'], color='#004E89', linewidth=2.5, label='30-day average')
+    # Rolling averages are computed in _staking_segments, so the caller's df isn't modified
+    staking_colors = [to_rgba('lightgray', 0.6), '#FF6B35', '#004E89']
+    staking_widths = [1, 2, 2.5]
+    staking_lines = ax3.add_collection(LineCollection(_staking_segments(x, df, rows),
+                                                      colors=staking_colors, linewidths=staking_widths))
+    staking_handles = [Line2D([], [], color=color, linewidth=width, label=label)
+                       for color, width, label in zip(staking_colors, staking_widths,
+                                                      ['Daily', '7-day average', '30-day average'])]
     
     # Add horizontal line for average staking percentage
-    avg_staked = df['staked_percentage'].mean()
-    ax3.axhline(y=avg_staked, color='red', linestyle='--', alpha=0.7, 
+    if avg_staked is None:
+        avg_staked = staking_summary(df)['mean']
+    avg_line = ax3.axhline(y=avg_staked, color='red', linestyle='--', alpha=0.7, 
                 label=f'Overall Avg: {avg_staked:.1f}%')
     
     ax3.set_title('Staking Percentage Trends with Moving Averages', fontsize=14, fontweight='bold')
     ax3.set_ylabel('Staked Percentage (%)', fontsize=12)
-    ax3.set_xlabel('Date', fontsize=12)
     ax3.grid(True, alpha=0.3)
-    ax3.legend()
+    ax3.legend(handles=staking_handles + [avg_line], loc='upper left')
     
     # 4. Circulating Supply or Market Cap (depending on data availability)
-    ax4 = plt.subplot(3, 2, 4)
     if has_usd_data:
-        ax4.plot(df['timestamp'], df['circulating_market_cap_usd'], color='#00BF63', linewidth=2.5)
+        ax4_column = 'circulating_market_cap_usd'
+        ax4_line, = ax4.plot(x, plot_df['circulating_market_cap_usd'], color='#00BF63', linewidth=2.5)
         ax4.set_title('Circulating Market Cap (USD) Over Time', fontsize=14, fontweight='bold')
         ax4.set_ylabel('Circulating Market Cap (USD)', fontsize=12)
         ax4.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x/1e9:.1f}B'))
         
         # Add current market cap annotation
         current_mcap = df.iloc[-1]['circulating_market_cap_usd']
-        ax4.annotate(f'Current: ${current_mcap/1e9:.2f}B', 
-                    xy=(df.iloc[-1]['timestamp'], current_mcap),
+        ax4_label = lambda v: f'Current: ${v/1e9:.2f}B'
+        ax4_annotation = ax4.annotate(ax4_label(current_mcap), 
+                    xy=(x[-1], current_mcap),
                     xytext=(10, 10), textcoords='offset points',
                     bbox=dict(boxstyle='round,pad=0.3', facecolor='lightgreen', alpha=0.7),
                     fontsize=10, fontweight='bold')
     else:
-        ax4.plot(df['timestamp'], df['circulating_tao'], color='#00BF63', linewidth=2.5)
+        ax4_column = 'circulating_tao'
+        ax4_line, = ax4.plot(x, plot_df['circulating_tao'], color='#00BF63', linewidth=2.5)
         ax4.set_title('Circulating TAO Supply Over Time', fontsize=14, fontweight='bold')
         ax4.set_ylabel('Circulating TAO', fontsize=12)
         ax4.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{x/1e6:.1f}M'))
         
         # Add current circulating annotation
         current_circ = df.iloc[-1]['circulating_tao']
-        ax4.annotate(f'Current: {current_circ/1e6:.1f}M TAO', 
-                    xy=(df.iloc[-1]['timestamp'], current_circ),
+        ax4_label = lambda v: f'Current: {v/1e6:.1f}M TAO'
+        ax4_annotation = ax4.annotate(ax4_label(current_circ), 
+                    xy=(x[-1], current_circ),
                     xytext=(10, 10), textcoords='offset points',
                     bbox=dict(boxstyle='round,pad=0.3', facecolor='lightgreen', alpha=0.7),
                     fontsize=10, fontweight='bold')
     
-    ax4.set_xlabel('Date', fontsize=12)
     ax4.grid(True, alpha=0.3)
     
     # 5. Supply Comparison (Staked vs Circulating)
-    ax5 = plt.subplot(3, 2, 5)
     if has_usd_data:
-        ax5.stackplot(df['timestamp'], 
-                      df['circulating_market_cap_usd'], 
-                      df['staked_market_cap_usd'],
-                      labels=['Circulating Market Cap', 'Staked Market Cap'],
-                      colors=['#00BF63', '#FF6B35'], alpha=0.7)
         ax5.set_title('Market Cap: Circulating vs Staked (USD)', fontsize=14, fontweight='bold')
         ax5.set_ylabel('Market Cap (USD)', fontsize=12)
         ax5.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x/1e9:.1f}B'))
     else:
-        ax5.stackplot(df['timestamp'], 
-                      df['circulating_tao'], 
-                      df['staked_tao'],
-                      labels=['Circulating TAO', 'Staked TAO'],
-                      colors=['#00BF63', '#FF6B35'], alpha=0.7)
         ax5.set_title('TAO Supply: Circulating vs Staked', fontsize=14, fontweight='bold')
         ax5.set_ylabel('TAO Supply', fontsize=12)
         ax5.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{x/1e6:.1f}M'))
@@ -471,8 +874,7 @@ def create_visualizations(df):
     ax5.legend(loc='upper left')
     
     # 6. Network Growth: Total Accounts
-    ax6 = plt.subplot(3, 2, 6)
-    ax6.plot(df['timestamp'], df['accounts'], color='#7209B7', linewidth=2.5)
+    accounts_line, = ax6.plot(x, plot_df['accounts'], color='#7209B7', linewidth=2.5)
     ax6.set_title('Network Growth: Total Accounts Over Time', fontsize=14, fontweight='bold')
     ax6.set_ylabel('Number of Accounts', fontsize=12)
     ax6.set_xlabel('Date', fontsize=12)
@@ -481,17 +883,149 @@ def create_visualizations(df):
     
     # Add current accounts annotation
     current_accounts = df.iloc[-1]['accounts']
-    ax6.annotate(f'Current: {current_accounts:,}', 
-                xy=(df.iloc[-1]['timestamp'], current_accounts),
+    ax6_label = lambda v: f'Current: {v:,}'
+    ax6_annotation = ax6.annotate(ax6_label(current_accounts), 
+                xy=(x[-1], current_accounts),
                 xytext=(10, 10), textcoords='offset points',
                 bbox=dict(boxstyle='round,pad=0.3', facecolor='lightblue', alpha=0.7),
                 fontsize=10, fontweight='bold')
     
-    plt.tight_layout(pad=3.0)
-    return fig
+    # Margins as measured from tight_layout(pad=3.0) on this figure (the right margin leaves
+    # room for the "Current" annotations), fixed so renders skip the layout pass
+    fig.subplots_adjust(left=0.06, right=0.90, top=0.96, bottom=0.055, hspace=0.15, wspace=0.15)
+    
+    artists = {
+        'axes': (ax1, ax2, ax3, ax4, ax5, ax6),
+        'has_usd_data': has_usd_data,
+        # Line2D handles and the column each one plots
+        'lines': [
+            (ax2_line, ax2_column),
+            (ax4_line, ax4_column),
+            (accounts_line, 'accounts'),
+        ],
+        'supply_lines': supply_lines,
+        'staking_lines': staking_lines,
+        'avg_line': avg_line,
+        'avg_label': ax3.get_legend().get_texts()[-1],
+        'fills': fills,
+        # "Current" annotations, the column they point at and how to label it
+        'annotations': [
+            (ax2_annotation, ax2_column, ax2_label),
+            (ax4_annotation, ax4_column, ax4_label),
+            (ax6_annotation, 'accounts', ax6_label),
+        ],
+    }
+    return fig, artists
+
+def update_visualizations(artists, df, avg_staked=None):
+    """Redraw a figure from build_visualizations with new data, keeping its axes, ticks and legends"""
+    ax1, ax2, ax3, ax4, ax5, ax6 = artists['axes']
+    rows = downsample_index(len(df))
+    plot_df = df.iloc[rows]
+    x = _date_nums(plot_df['timestamp'])
+    
+    for line, column in artists['lines']:
+        line.set_data(x, plot_df[column])
+    
+    artists['supply_lines'].set_segments(_supply_segments(x, plot_df))
+    artists['staking_lines'].set_segments(_staking_segments(x, df, rows))
+    if avg_staked is None:
+        avg_staked = staking_summary(df)['mean']
+    artists['avg_line'].set_ydata([avg_staked, avg_staked])
+    artists['avg_label'].set_text(f'Overall Avg: {avg_staked:.1f}%')
+    
+    latest = df.iloc[-1]
+    for annotation, column, label in artists['annotations']:
+        annotation.xy = (x[-1], latest[column])
+        annotation.set_text(label(latest[column]))
+    
+    # Drop the old filled areas before recomputing limits so their extents don't linger. Older
+    # matplotlib's relim() skips collections, so add the line collections' extents explicitly;
+    # the new filled areas add their own as they are drawn
+    for collection in artists['fills']:
+        collection.remove()
+    for ax in artists['axes']:
+        ax.relim()
+    for ax, collection in ((ax1, artists['supply_lines']), (ax3, artists['staking_lines'])):
+        ax.update_datalim(np.concatenate(collection.get_segments()))
+    artists['fills'] = _draw_fills(ax1, ax5, x, plot_df, artists['has_usd_data'])
+    
+    ax1.set_xlim(x[0], x[-1])
+    for ax in artists['axes']:
+        ax.autoscale_view(scalex=False)
+    ax1.figure.canvas.draw_idle()
+
+def _panel_cells(fig):
+    """Regions of fig (in inches) holding each of the six panels with its labels, in axes order"""
+    from matplotlib.transforms import Bbox
+    
+    axes = fig.axes[:6]
+    width, height = fig.get_size_inches()
+    # Upper rows hide their shared x tick labels, so each row's cell ends at the bottom of
+    # its axes; the right column's y labels sit in the gap after the left column's axes
+    split_x = axes[0].get_position().x1
+    row_bottoms = [axes[0].get_position().y0, axes[2].get_position().y0, 0.0]
+    cells = []
+    for i in range(len(axes)):
+        row, col = divmod(i, 2)
+        x0, x1 = (0.0, split_x) if col == 0 else (split_x, 1.0)
+        y0 = row_bottoms[row]
+        y1 = 1.0 if row == 0 else row_bottoms[row - 1]
+        cells.append(Bbox.from_extents(x0 * width, y0 * height, x1 * width, y1 * height))
+    return cells
+
+def _render_panel(task):
+    """Render one panel's cell of the figure to PNG bytes; runs in a worker process.
+    
+    Returns (png bytes, left and top pixel offset of the cell, figure size in pixels).
+    """
+    # A forked worker inherits the parent's backend, which is interactive with --show; GUI
+    # figure managers aren't safe in forked children, and the panel only needs rasterizing
+    import matplotlib
+    matplotlib.use('Agg')
+    
+    df_bytes, panel, dpi, avg_staked = task
+    df = pd.read_parquet(io.BytesIO(df_bytes))
+    fig, _ = build_visualizations(df, avg_staked=avg_staked)
+    
+    # Hidden axes aren't drawn, and saving just this cell only rasterizes its area
+    for i, ax in enumerate(fig.axes[:6]):
+        ax.set_visible(i == panel)
+    cell = _panel_cells(fig)[panel]
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=dpi, bbox_inches=cell, facecolor='white')
+    
+    width, height = fig.get_size_inches()
+    offset = (round(cell.x0 * dpi), round((height - cell.y1) * dpi))
+    return buffer.getvalue(), offset, (round(width * dpi), round(height * dpi))
+
+def render_parallel(df, output_file, dpi=150, avg_staked=None, processes=6):
+    """Render the figure to output_file with each panel drawn in its own process.
+    
+    Worth it for high-dpi saves, where rasterizing dominates the process start-up cost.
+    """
+    from PIL import Image, ImageOps
+    
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, index=False)
+    tasks = [(buffer.getvalue(), panel, dpi, avg_staked) for panel in range(6)]
+    with multiprocessing.Pool(processes) as pool:
+        panels = pool.map(_render_panel, tasks)
+    
+    image = Image.new('RGB', panels[0][2], 'white')
+    for png, offset, _ in panels:
+        image.paste(Image.open(io.BytesIO(png)).convert('RGB'), offset)
+    
+    # Trim the blank border like bbox_inches='tight' does, keeping its 0.1in padding
+    content = ImageOps.invert(image.convert('L')).getbbox()
+    if content is not None:
+        pad = round(0.1 * dpi)
+        image = image.crop((max(content[0] - pad, 0), max(content[1] - pad, 0),
+                            min(content[2] + pad, image.width), min(content[3] + pad, image.height)))
+    image.save(output_file, dpi=(dpi, dpi))
 
 def print_summary_stats(df):
-    """Print summary statistics"""
+    """Print summary statistics and return the staked percentage summary (see staking_summary)"""
     print("\n" + "="*60)
     print("TAO STAKING ANALYSIS SUMMARY")
     print("="*60)
@@ -519,11 +1053,12 @@ def print_summary_stats(df):
     print(f"  Balance Holders: {latest['balance_holders']:,}")
     print()
     
+    stats = staking_summary(df)
     print("STAKING STATISTICS:")
-    print(f"  Average Staked %: {df['staked_percentage'].mean():.2f}%")
-    print(f"  Minimum Staked %: {df['staked_percentage'].min():.2f}%")
-    print(f"  Maximum Staked %: {df['staked_percentage'].max():.2f}%")
-    print(f"  Standard Deviation: {df['staked_percentage'].std():.2f}%")
+    print(f"  Average Staked %: {stats['mean']:.2f}%")
+    print(f"  Minimum Staked %: {stats['min']:.2f}%")
+    print(f"  Maximum Staked %: {stats['max']:.2f}%")
+    print(f"  Standard Deviation: {stats['std']:.2f}%")
     print()
     
     print("GROWTH METRICS:")
@@ -535,42 +1070,97 @@ def print_summary_stats(df):
     print(f"  Staked TAO Growth: {staked_growth:.1f}%")
     print(f"  Accounts Growth: {accounts_growth:.1f}%")
     print()
+    return stats
 
-def get_price_for_date(price_data, date_str):
-    """Helper function to get price for a specific date"""
-    if date_str in price_data:
-        return price_data[date_str]
+def add_usd_columns(df, price_data):
+    """Add TAO price and market cap columns to a timestamp-sorted DataFrame.
+    
+    Each row gets the price for its date, or the next available date, falling back
+    to the last known price for rows past the end of the price data.
+    """
+    prices_df = pd.DataFrame({
+        'date': pd.to_datetime(list(price_data.keys())).astype('datetime64[ns]'),
+        'tao_price_usd': list(price_data.values())
+    }).sort_values('date')
     
-    # Find the closest available date
-    available_dates = sorted(price_data.keys())
-    for available_date in available_dates:
-        if available_date >= date_str:
-            return price_data[available_date]
+    # Price data is keyed by UTC calendar date
+    timestamps = df['timestamp']
+    if timestamps.dt.tz is not None:
+        timestamps = timestamps.dt.tz_convert(None)
+    row_dates = pd.DataFrame({'date': timestamps.dt.normalize().astype('datetime64[ns]').to_numpy()})
     
-    # If no future date found, use the last available price
-    if available_dates:
-        return price_data[available_dates[-1]]
+    merged = pd.merge_asof(row_dates, prices_df, on='date', direction='forward')
+    tao_price_usd = merged['tao_price_usd'].ffill().to_numpy()
     
-    return None
+    df['total_market_cap_usd'] = df['issued_tao'] * tao_price_usd
+    df['staked_market_cap_usd'] = df['staked_tao'] * tao_price_usd
+    df['circulating_market_cap_usd'] = df['circulating_tao'] * tao_price_usd
+    df['tao_price_usd'] = tao_price_usd
+    return df
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(
+        description="Fetch TAO Stats data and plot staked percentage vs supply over time.")
+    
+    cache_group = parser.add_mutually_exclusive_group()
+    cache_group.add_argument('--use-cache', dest='use_cache', action='store_true',
+                             help="reuse the latest saved dataset in the output directory if there is one")
+    cache_group.add_argument('--refresh', dest='use_cache', action='store_false',
+                             help="fetch fresh data from the API (default)")
+    
+    show_group = parser.add_mutually_exclusive_group()
+    show_group.add_argument('--show', dest='show', action='store_true',
+                            help="open the plot window after saving (default if TAO_SHOW is set)")
+    show_group.add_argument('--no-show', dest='show', action='store_false',
+                            help="only save the plot")
+    
+    parser.add_argument('--dpi', type=int, default=150,
+                        help="resolution of the saved plot (default: 150; use 300 for publication)")
+    parser.add_argument('--parallel-render', action='store_true',
+                        help="render the six panels in separate processes (faster for high --dpi)")
+    parser.add_argument('--csv', action='store_true',
+                        help="also save the dataset as CSV for tools that can't read Parquet")
+    parser.add_argument('--output-dir', default='.',
+                        help="directory for the saved plot and dataset (default: current directory)")
+    parser.set_defaults(use_cache=False, show=None)
+    
+    args = parser.parse_args(argv)
+    if args.show is None:
+        args.show = os.environ.get('TAO_SHOW', '').lower() not in ('', '0', 'false', 'no')
+    return args
+
+def fetch_with_prices():
+    """Bring the local dataset up to date and add USD columns from historical prices"""
+    api = TaoStatsAPI()
+    df = api.fetch_dataset()
+    if df is None or df.empty:
+        return df
+    
+    price_data = api.get_or_fetch_price_data()
+    if price_data:
+        df = add_usd_columns(df, price_data)
+    return df
+
 
 def main():
     """Main function to run the analysis"""
+    args = parse_args()
+    
     print("TAO Stats Visualizer")
     print("===================")
     
     # Check if we have recent data file
-    import glob
-    existing_files = glob.glob("tao_staking_data_*.csv")
+    os.makedirs(args.output_dir, exist_ok=True)
+    existing_files = glob.glob(os.path.join(args.output_dir, "tao_staking_data_*.parquet"))
     
     if existing_files:
         latest_file = max(existing_files)
         print(f"\nFound existing data file: {latest_file}")
-        user_input = input("Use existing data? (y/n): ").lower().strip()
         
-        if user_input == 'y':
+        if args.use_cache:
             print("Loading existing data...")
-            df = pd.read_csv(latest_file)
-            df['timestamp'] = pd.to_datetime(df['timestamp'], format='ISO8601')
+            df = pd.read_parquet(latest_file)
             print(f"Loaded {len(df)} data points from {latest_file}")
             
             # Check if we need to add price data to existing data
@@ -590,65 +1180,56 @@ def main():
                 price_data = api.get_or_fetch_price_data(start_date, end_date)
                 
                 if price_data:
-                    # Add price data to existing dataframe
-                    df['tao_price_usd'] = df['timestamp'].apply(
-                        lambda ts: get_price_for_date(price_data, ts.strftime('%Y-%m-%d'))
-                    )
-                    
-                    # Recalculate USD columns
-                    df['total_market_cap_usd'] = df['issued_tao'] * df['tao_price_usd']
-                    df['staked_market_cap_usd'] = df['staked_tao'] * df['tao_price_usd']
-                    df['circulating_market_cap_usd'] = df['circulating_tao'] * df['tao_price_usd']
+                    # Add price data and recalculate USD columns
+                    df = add_usd_columns(df.sort_values('timestamp'), price_data)
                     
                     print(f"Updated {len(df)} data points with historical prices")
         else:
-            print("Fetching fresh data...")
-            # Initialize API client
-            api = TaoStatsAPI()
-            
-            # Fetch all data
-            raw_data = api.fetch_all_data()
-            
-            if not raw_data:
-                print("No data fetched. Exiting.")
-                return
-            
-            # Process data WITH USD using historical prices
-            df = api.process_data(raw_data, include_usd=True)
+            print("Fetching fresh data (pass --use-cache to reuse it)...")
+            df = fetch_with_prices()
     else:
         print("No existing data found. Fetching fresh data...")
-        # Initialize API client
-        api = TaoStatsAPI()
-        
-        # Fetch all data
-        raw_data = api.fetch_all_data()
-        
-        if not raw_data:
-            print("No data fetched. Exiting.")
-            return
-        
-        # Process data WITH USD using historical prices
-        df = api.process_data(raw_data, include_usd=True)
+        df = fetch_with_prices()
+    
+    if df is None or df.empty:
+        print("No data fetched. Exiting.")
+        return
     
     # Print summary statistics
-    print_summary_stats(df)
+    stats = print_summary_stats(df)
     
-    # Create visualizations
+    # Create visualizations; headless runs render with Agg
     print("\nGenerating visualizations...")
-    fig = create_visualizations(df)
+    _import_pyplot(interactive=args.show)
+    output_file = os.path.join(args.output_dir, f"tao_staking_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png")
     
     # Save the plot
-    output_file = f"tao_staking_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-    fig.savefig(output_file, dpi=300, bbox_inches='tight', facecolor='white')
+    if args.parallel_render:
+        fig = None
+        render_parallel(df, output_file, dpi=args.dpi, avg_staked=stats['mean'])
+    else:
+        fig = create_visualizations(df, avg_staked=stats['mean'])
+        fig.savefig(output_file, dpi=args.dpi, bbox_inches='tight', facecolor='white')
     print(f"Saved visualization to: {output_file}")
     
     # Show the plot
-    plt.show()
+    if args.show:
+        if fig is None:
+            create_visualizations(df, avg_staked=stats['mean'])
+        _import_pyplot().show()
+    
+    # Save data to Parquet (keeps dtypes, so timestamps don't need re-parsing on load)
+    data_file = os.path.join(args.output_dir, f"tao_staking_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.parquet")
+    df.to_parquet(data_file, index=False, compression='zstd')
+    print(f"Saved data to: {data_file}")
     
-    # Save data to CSV
-    csv_file = f"tao_staking_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-    df.to_csv(csv_file, index=False)
-    print(f"Saved data to: {csv_file}")
+    if args.csv:
+        # pyarrow's CSV writer is much faster than DataFrame.to_csv
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+        csv_file = os.path.splitext(data_file)[0] + '.csv'
+        pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), csv_file)
+        print(f"Saved data to: {csv_file}")
 
 if __name__ == "__main__":
     main()